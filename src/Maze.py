@@ -21,8 +21,28 @@ from Agent import Agent
 from Astar import *
 from Q_learning import *
 
+
+class _HeadlessWindow:
+    """
+    Stand-in for a curses window that drops all drawing, used when the maze runs without a terminal
+    """
+
+    def addstr(self, *args):
+        pass
+
+    def attrset(self, *args):
+        pass
+
+    def box(self, *args):
+        pass
+
+    def refresh(self):
+        pass
+
+
 class Maze:
-    def __init__(self, size, data=None, wall_coverage=None, filled_reward=False, seed=0):
+    def __init__(self, size, data=None, wall_coverage=None, filled_reward=False, seed=0, headless=False,
+                 agent_params=None):
         self._sprite = {MazeObject.WALL: ("█", "█"), MazeObject.EMPTY: (" ", " "),
                         MazeObject.REWARD: ("・", ""), MazeObject.AGENT: ("●", " "), "GHOST": ("G", " ")}
         self._static_color = {MazeObject.WALL: Color.BLUE,
@@ -36,9 +56,14 @@ class Maze:
         self._collected = 0
         self._num_reward = 20
         self._seed = seed
+        self._headless = headless  # Skip all rendering, curses does not need to be initialized
+        self._agent_params = agent_params or {}  # Keyword arguments for the QLearningAgent
 
         # Main game box
-        self._box = curses.newwin(self._size + 2, (self._size + 1) * 2, 4, 0)
+        if self._headless:
+            self._box = _HeadlessWindow()
+        else:
+            self._box = curses.newwin(self._size + 2, (self._size + 1) * 2, 4, 0)
         self._box.attrset(Color.BLUE)
         self._box.box()
 
@@ -48,16 +73,20 @@ class Maze:
         self._green_zone = []  # Coordinates of non-hostile agents
 
         # Score box
-        self._score_box = curses.newwin(self._size + 2, (self._size + 1) * 2, 0, 0)
+        if self._headless:
+            self._score_box = _HeadlessWindow()
+        else:
+            self._score_box = curses.newwin(self._size + 2, (self._size + 1) * 2, 0, 0)
         self._score = 0
         self._iteration = 0
 
         # Render score box
-        for line in range(4):
-            self._score_box.addstr(line, 0, " " * (self._size + 1) * 2, self._static_color[MazeObject.REWARD])
+        if not self._headless:
+            for line in range(4):
+                self._score_box.addstr(line, 0, " " * (self._size + 1) * 2, self._static_color[MazeObject.REWARD])
 
-        self._score_box.addstr(1, 0, " ITERATIONS", curses.A_BOLD | Color.WHITE)
-        self._score_box.addstr(1, (self._size + 1) * 2 - 14, "🍒 HIGH SCORE", curses.A_BOLD | Color.WHITE)
+            self._score_box.addstr(1, 0, " ITERATIONS", curses.A_BOLD | Color.WHITE)
+            self._score_box.addstr(1, (self._size + 1) * 2 - 14, "🍒 HIGH SCORE", curses.A_BOLD | Color.WHITE)
         self._update_score()
         self._update_iteration()
 
@@ -233,7 +262,7 @@ class Maze:
             self._score = self._score + 1
             self._update_score()
 
-            if self._collected == self._num_reward:
+            if self._collected == self._num_reward and not self._headless:
                 while True:
                     sleep(1)
 
@@ -269,7 +298,7 @@ class Maze:
                 if is_hostile:
                     agent = Agent(color, is_hostile, (y, x), agent_sprite)
                 else:
-                    agent = QLearningAgent(color, is_hostile, (y, x), agent_sprite)
+                    agent = QLearningAgent(color, is_hostile, (y, x), agent_sprite, **self._agent_params)
                 break
 
         self._agents.append(agent)
@@ -327,6 +356,7 @@ class Maze:
         self._score = 0
         self._update_score()
         self._collected = 0
+        self._agents[0].end_episode()
 
         self._green_zone = []
         self._red_zone = [(-1, -1)]
@@ -339,6 +369,22 @@ class Maze:
             self._red_zone.append(self._agents[index].get_position())
         self._init_draw()
 
+    def get_iteration(self):
+        """
+        Return number of finished episodes, i.e. how many times the maze was reset
+        """
+
+        return self._iteration
+
+    def get_agent(self):
+        """
+        Return the learning (non-hostile) agent
+        """
+
+        for agent in self._agents:
+            if not agent.is_hostile():
+                return agent
+
     def get_agent_pos(self):
         for agent in self._agents:
             if not agent.is_hostile():
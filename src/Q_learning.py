@@ -1,11 +1,15 @@
 import numpy as np
 import random
+import heapq
+from collections import OrderedDict
 from Agent import *
 
 
 # Q-learning agent
 class QLearningAgent(Agent):
-    def __init__(self, color, is_hostile, position, sprite, learning_rate=0.01, discount_factor=0.9, exploration_prob=0.6):
+    def __init__(self, color, is_hostile, position, sprite, learning_rate=0.01, discount_factor=0.9, exploration_prob=0.6,
+                 planning_steps=0, priority_threshold=1e-4, trace_decay=0.0, trace_threshold=0.01, max_traces=1000,
+                 q_values=None, evaluate=False):
         super().__init__(color, is_hostile, position, sprite)
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
@@ -13,9 +17,30 @@ class QLearningAgent(Agent):
         self.epsilon_decay = 0.995
         self.epsilon_min = 0.01
         self.n_actions = []
-        self.q_values = {}
+        self.q_values = {} if q_values is None else q_values  # Initial table, e.g. to warm-start training
+        self._state_actions = {}  # state -> actions available in that state, recorded when acting from it
         self._sprite = sprite
 
+        # Evaluation only plays greedily and never writes the table, so it may be a read-only SharedQTable
+        self.learning = not evaluate
+        if evaluate:
+            self.exploration_prob = 0
+
+        # Dyna-Q planning with prioritized sweeping (disabled when planning_steps is 0)
+        self.planning_steps = planning_steps
+        self.priority_threshold = priority_threshold
+        self._model = {}  # (state, action) -> (reward, next_state)
+        self._predecessors = {}  # next_state -> set of (state, action) leading to it
+        self._priority_queue = []  # heap of (-priority, counter, (state, action))
+        self._priorities = {}  # (state, action) -> priority currently queued
+        self._queue_counter = 0
+
+        # Watkins Q(lambda) eligibility traces (disabled when trace_decay is 0)
+        self.trace_decay = trace_decay
+        self.trace_threshold = trace_threshold
+        self.max_traces = max_traces
+        self._traces = OrderedDict()  # (state, action) -> eligibility, oldest (smallest) first
+
     def get_sprite(self):
         return self._sprite
 
@@ -29,21 +54,114 @@ class QLearningAgent(Agent):
     #                 self.q_values[((row, col), action)] = 0
 
     def get_q_value(self, state, action):
-        if (state, action) not in self.q_values.keys():
-            return 0
-        return self.q_values.get((state, action))
+        return self.q_values.get((state, action), 0)
 
     def choose_action(self, state):
+        self._state_actions[state] = self.n_actions
         if random.uniform(0, 1) < self.exploration_prob:
-            return random.choice(self.n_actions)
+            action = random.choice(self.n_actions)
+            if self.trace_decay > 0 and \
+                    self.get_q_value(state, action) < max(self.get_q_value(state, a) for a in self.n_actions):
+                self._traces.clear()  # Exploratory action, credit no longer follows the greedy policy
+            return action
         else:
             q_values = [self.get_q_value(state, action) for action in self.n_actions]
             return self.n_actions[np.argmax(q_values)]
 
     def update_q_value(self, state, action, reward, next_state):
-        best_next_action = max(self.n_actions, key=lambda a: self.get_q_value(next_state, a))
-        new_q_value = (1 - self.learning_rate) * self.get_q_value(state, action) + \
-                      self.learning_rate * (
-                              reward + self.discount_factor * self.get_q_value(next_state, best_next_action))
-        self.q_values[(state, action)] = new_q_value
+        if not self.learning:
+            return
+
+        target = reward + self.discount_factor * self._best_q_value(next_state)
+        if self.trace_decay > 0:
+            self._update_traces(state, action, target - self.get_q_value(state, action))
+        else:
+            new_q_value = (1 - self.learning_rate) * self.get_q_value(state, action) + self.learning_rate * target
+            self.q_values[(state, action)] = new_q_value
         self.exploration_prob = max(self.exploration_prob * self.epsilon_decay, self.epsilon_min)
+
+        if self.planning_steps > 0:
+            self._record_transition(state, action, reward, next_state)
+            self._plan()
+
+    def end_episode(self):
+        """
+        Drop all eligibility traces, call whenever the maze is reset
+        """
+
+        self._traces.clear()
+
+    def _update_traces(self, state, action, td_error):
+        """
+        Apply the TD error to every (state, action) with an active trace, then decay and truncate the traces.
+        Replacing traces decay uniformly, so insertion order is also ascending eligibility order
+        """
+
+        self._traces[(state, action)] = 1.0
+        self._traces.move_to_end((state, action))
+
+        decay = self.discount_factor * self.trace_decay
+        for key, eligibility in self._traces.items():
+            self.q_values[key] = self.get_q_value(*key) + self.learning_rate * td_error * eligibility
+            self._traces[key] = eligibility * decay
+
+        while self._traces and (len(self._traces) > self.max_traces or
+                                next(iter(self._traces.values())) < self.trace_threshold):
+            self._traces.popitem(last=False)
+
+    def _best_q_value(self, state):
+        """
+        Max Q-value over the actions available in state. States never acted from (e.g. terminal ones) have no
+        Q-values, so they are worth 0
+        """
+
+        actions = self._state_actions.get(state)
+        if not actions:
+            return 0
+        return max(self.get_q_value(state, action) for action in actions)
+
+    def _td_error(self, state, action):
+        reward, next_state = self._model[(state, action)]
+        return reward + self.discount_factor * self._best_q_value(next_state) - self.get_q_value(state, action)
+
+    def _queue(self, state, action):
+        """
+        Push (state, action) onto the priority queue if its TD error is above the threshold
+        and higher than the priority it is already queued with
+        """
+
+        priority = abs(self._td_error(state, action))
+        if priority <= self.priority_threshold or priority <= self._priorities.get((state, action), 0):
+            return
+        self._priorities[(state, action)] = priority
+        self._queue_counter += 1
+        heapq.heappush(self._priority_queue, (-priority, self._queue_counter, (state, action)))
+
+    def _record_transition(self, state, action, reward, next_state):
+        self._model[(state, action)] = (reward, next_state)
+        self._predecessors.setdefault(next_state, set()).add((state, action))
+        self._queue(state, action)
+
+        # The real update just changed Q(state, action), which may be the value its predecessors bootstrap from
+        for predecessor in self._predecessors.get(state, ()):
+            self._queue(*predecessor)
+
+    def _plan(self):
+        """
+        Run up to planning_steps simulated backups from the learned model, highest TD error first
+        """
+
+        for _ in range(self.planning_steps):
+            while self._priority_queue:
+                negative_priority, _, key = heapq.heappop(self._priority_queue)
+                if self._priorities.get(key) == -negative_priority:
+                    break  # Skip stale entries superseded by a higher priority push
+            else:
+                return
+
+            del self._priorities[key]
+            state, action = key
+            self.q_values[key] = self.get_q_value(state, action) + self.learning_rate * self._td_error(state, action)
+
+            for predecessor in self._predecessors.get(state, ()):
+                self._queue(*predecessor)
@@ -0,0 +1,282 @@
+##################################################
+## Read-only Q-table and maze layouts placed in
+## shared memory for evaluation worker pools
+##################################################
+
+import sys
+import threading
+import numpy as np
+from collections.abc import Mapping
+from multiprocessing import shared_memory, resource_tracker
+
+from Action import Action
+
+_HEADER = np.dtype(np.int64).itemsize
+_register_lock = threading.Lock()
+
+
+def _create(name, size):
+    """
+    Create a new segment. Holds the lock _attach uses, so the creation is never missing from the tracker
+
+    :param name: name of the segment (None to generate one)
+    :param size: size in bytes
+    :return: SharedMemory
+    """
+
+    with _register_lock:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+
+
+def _attach(name):
+    """
+    Attach to an existing segment without letting this process' resource tracker unlink it on exit
+
+    :param name: name of the shared memory segment
+    :return: SharedMemory
+    """
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    # Python < 3.13 always registers. Pool workers share the publisher's tracker, so unregistering afterwards
+    # would drop the publisher's entry too; skip the registration instead. Other code in this process must
+    # not create segments concurrently with attach(), only creation through publish() takes the same lock
+    with _register_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class _SharedSegment:
+    def __init__(self, shm, owner=False):
+        self._shm = shm
+        self._owner = owner
+        self._map_views()
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def close(self):
+        """
+        Detach this process from the segment. Arrays over the segment never leave this object, so nothing
+        returned earlier points into the unmapped memory
+        """
+
+        self._release_views()
+        self._shm.close()
+
+    def __del__(self):
+        # Drop the views first so SharedMemory can close its mapping when it is collected right after
+        self._release_views()
+
+    def unlink(self):
+        """
+        Destroy the segment, only the publishing process should call this once all workers are done
+        """
+
+        if not self._owner:
+            raise Exception("Only the publisher can unlink a shared segment")
+        self._shm.unlink()
+
+    def _view(self, shape, dtype, offset):
+        """
+        Read-only array over the segment, for internal use only. It holds a buffer export, so closing the
+        segment while one is still referenced raises BufferError rather than unmapping memory in use
+        """
+
+        count = int(np.prod(shape))
+        view = np.frombuffer(self._shm.buf, dtype=dtype, count=count, offset=offset).reshape(shape)
+        view.flags.writeable = False
+        return view
+
+    def _map_views(self):
+        pass
+
+    def _release_views(self):
+        pass
+
+    def _check_open(self):
+        if self._shm.buf is None:
+            raise ValueError("shared segment is closed")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self  # Read-only, so copies (e.g. Maze._initial_agents) share the segment instead of duplicating it
+
+    def __reduce__(self):
+        return type(self).attach, (self.name,)  # Pickled into a worker, re-attach by name instead of copying
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.close()
+        finally:
+            if self._owner:
+                self.unlink()
+
+
+class SharedQTable(_SharedSegment, Mapping):
+    """
+    Frozen Q-table keyed by (state hash, Action). Pass it as QLearningAgent(q_values=..., evaluate=True), e.g.
+    through Maze(agent_params={"q_values": table, "evaluate": True}), to play a trained agent greedily
+
+    Segment layout: count (int64), states (int64[count]), values (float64[count]), actions (int8[count]),
+    sorted by (state, action) so lookups are a binary search over the states array
+    """
+
+    def _map_views(self):
+        count = int(self._view((1,), np.int64, 0)[0])
+        offset = _HEADER
+        self._states = self._view((count,), np.int64, offset)
+        offset += self._states.nbytes
+        self._values = self._view((count,), np.float64, offset)
+        offset += self._values.nbytes
+        self._actions = self._view((count,), np.int8, offset)
+
+    @classmethod
+    def publish(cls, q_values, name=None):
+        """
+        Copy a Q-table into a new shared memory segment
+
+        :param q_values: dict of (state hash, Action) -> value, e.g. QLearningAgent.q_values
+        :param name: name of the segment (Optional, generated if not given)
+        :return: owning SharedQTable, pass its name to workers
+        """
+
+        count = len(q_values)
+        keys = sorted(q_values.keys(), key=lambda key: (key[0], key[1].value))
+        size = _HEADER + count * (np.dtype(np.int64).itemsize + np.dtype(np.float64).itemsize +
+                                  np.dtype(np.int8).itemsize)
+        shm = _create(name, size)
+
+        offset = _HEADER
+        np.ndarray((1,), dtype=np.int64, buffer=shm.buf)[0] = count
+        states = np.ndarray((count,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        states[:] = [key[0] for key in keys]
+        offset += states.nbytes
+        values = np.ndarray((count,), dtype=np.float64, buffer=shm.buf, offset=offset)
+        values[:] = [q_values[key] for key in keys]
+        offset += values.nbytes
+        actions = np.ndarray((count,), dtype=np.int8, buffer=shm.buf, offset=offset)
+        actions[:] = [key[1].value for key in keys]
+        del states, values, actions
+
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attach zero-copy to a Q-table published by another process
+
+        :param name: name of the segment
+        :return: SharedQTable
+        """
+
+        return cls(_attach(name))
+
+    def _release_views(self):
+        self._states = self._values = self._actions = None
+
+    def __getitem__(self, key):
+        self._check_open()
+        state, action = key
+        index = int(np.searchsorted(self._states, state))
+        while index < len(self._states) and self._states[index] == state:
+            if self._actions[index] == action.value:
+                return float(self._values[index])
+            index += 1
+        raise KeyError(key)
+
+    def __iter__(self):
+        self._check_open()
+        for state, action in zip(self._states.tolist(), self._actions.tolist()):
+            yield state, Action(action)
+
+    def __len__(self):
+        self._check_open()
+        return len(self._states)
+
+
+class SharedMazeLayouts(_SharedSegment):
+    """
+    Set of maze grids, e.g. Maze._initial_data of several mazes. Attaching is zero-copy; each access returns
+    a private copy of one grid, which Maze needs anyway as it mutates its data
+
+    Segment layout: count (int64), sizes (int64[count]), offsets (int64[count]), grid data (int8)
+    """
+
+    def _map_views(self):
+        count = int(self._view((1,), np.int64, 0)[0])
+        self._sizes = self._view((count,), np.int64, _HEADER)
+        self._offsets = self._view((count,), np.int64, _HEADER + self._sizes.nbytes)
+        self._layouts = [self._view((size, size), np.int8, offset)
+                         for size, offset in zip(self._sizes.tolist(), self._offsets.tolist())]
+
+    @classmethod
+    def publish(cls, layouts, name=None):
+        """
+        Copy maze grids into a new shared memory segment
+
+        :param layouts: list of square 2D arrays of MazeObject values
+        :param name: name of the segment (Optional, generated if not given)
+        :return: owning SharedMazeLayouts, pass its name to workers
+        """
+
+        count = len(layouts)
+        data_start = _HEADER * (1 + 2 * count)
+        offsets = []
+        size = data_start
+        for layout in layouts:
+            offsets.append(size)
+            size += len(layout) * len(layout)
+        shm = _create(name, max(size, 1))
+
+        header = np.ndarray((1 + 2 * count,), dtype=np.int64, buffer=shm.buf)
+        header[0] = count
+        header[1:1 + count] = [len(layout) for layout in layouts]
+        header[1 + count:] = offsets
+        for layout, offset in zip(layouts, offsets):
+            grid = np.ndarray((len(layout), len(layout)), dtype=np.int8, buffer=shm.buf, offset=offset)
+            grid[:] = layout
+            del grid
+        del header
+
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attach zero-copy to maze layouts published by another process
+
+        :param name: name of the segment
+        :return: SharedMazeLayouts
+        """
+
+        return cls(_attach(name))
+
+    def _release_views(self):
+        self._sizes = self._offsets = self._layouts = None
+
+    def __getitem__(self, index):
+        """
+        Copy of a layout, can be passed straight to Maze as data
+
+        :param index: index of the layout
+        :return: 2D numpy array
+        """
+
+        self._check_open()
+        return np.array(self._layouts[index])
+
+    def __len__(self):
+        self._check_open()
+        return len(self._layouts)
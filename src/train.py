@@ -0,0 +1,105 @@
+##################################################
+## Headless training runner, no terminal UI
+##################################################
+
+import argparse
+import pickle
+import random
+from time import perf_counter
+
+import numpy as np
+
+from Maze import Maze
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the Pacman Q-learning agent without a terminal UI")
+    parser.add_argument("--size", type=int, default=15, help="maze size (default: 15)")
+    parser.add_argument("--coverage", type=float, default=0.1, help="wall coverage between 0.0 and 1.0 (default: 0.1)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for maze generation and exploration (default: 0)")
+    parser.add_argument("--filled-reward", action=argparse.BooleanOptionalAction, default=True,
+                        help="fill every non-wall cell with a reward (default: on)")
+    parser.add_argument("--learning-rate", type=float, default=0.01, help="Q-learning step size (default: 0.01)")
+    parser.add_argument("--discount-factor", type=float, default=0.9, help="reward discount factor (default: 0.9)")
+    parser.add_argument("--exploration-prob", type=float, default=0.6,
+                        help="initial epsilon-greedy exploration probability (default: 0.6)")
+    parser.add_argument("--planning-steps", type=int, default=0, help="Dyna-Q backups per real step (default: 0)")
+    parser.add_argument("--priority-threshold", type=float, default=1e-4,
+                        help="smallest TD error queued for planning (default: 0.0001)")
+    parser.add_argument("--trace-decay", type=float, default=0.0, help="Q(lambda) trace decay (default: 0)")
+    parser.add_argument("--trace-threshold", type=float, default=0.01,
+                        help="eligibility below which a trace is dropped (default: 0.01)")
+    parser.add_argument("--max-traces", type=int, default=1000,
+                        help="maximum number of active traces (default: 1000)")
+    parser.add_argument("--episodes", type=int, help="stop after this many episodes")
+    parser.add_argument("--time-limit", type=float, help="stop after this many seconds of wall-clock time")
+    parser.add_argument("--report-interval", type=float, default=5.0,
+                        help="seconds between throughput reports (default: 5)")
+    parser.add_argument("--output", help="file to pickle the learned Q-table to when training ends")
+
+    args = parser.parse_args()
+    if args.episodes is None and args.time_limit is None:
+        parser.error("at least one of --episodes or --time-limit is required")
+    if args.episodes is not None and args.episodes <= 0:
+        parser.error("--episodes must be greater than 0")
+    if args.time_limit is not None and args.time_limit <= 0:
+        parser.error("--time-limit must be greater than 0")
+    if args.report_interval <= 0:
+        parser.error("--report-interval must be greater than 0")
+    if args.max_traces <= 0:
+        parser.error("--max-traces must be greater than 0")
+    return args
+
+
+def report(steps, episodes, elapsed, interval_steps, interval_episodes, interval):
+    """
+    Print totals, the rate over the last interval and the average rate since start
+    """
+
+    print(f"steps {steps:>10}  episodes {episodes:>8}  elapsed {elapsed:8.1f}s  "
+          f"interval {interval_steps / interval:10.1f} steps/s {interval_episodes / interval:8.2f} episodes/s  "
+          f"average {steps / elapsed:10.1f} steps/s {episodes / elapsed:8.2f} episodes/s", flush=True)
+
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+
+    agent_params = {"learning_rate": args.learning_rate, "discount_factor": args.discount_factor,
+                    "exploration_prob": args.exploration_prob, "planning_steps": args.planning_steps,
+                    "priority_threshold": args.priority_threshold, "trace_decay": args.trace_decay,
+                    "trace_threshold": args.trace_threshold, "max_traces": args.max_traces}
+    maze = Maze(args.size, wall_coverage=args.coverage, filled_reward=args.filled_reward, seed=args.seed,
+                headless=True, agent_params=agent_params)
+
+    steps = 0
+    start = perf_counter()
+    last_report, last_steps, last_episodes = start, 0, 0
+    while True:
+        maze.play()
+        steps += 1
+
+        now = perf_counter()
+        episodes = maze.get_iteration()
+        if args.episodes is not None and episodes >= args.episodes:
+            break
+        if args.time_limit is not None and now - start >= args.time_limit:
+            break
+        if now - last_report >= args.report_interval:
+            report(steps, episodes, now - start, steps - last_steps, episodes - last_episodes, now - last_report)
+            last_report, last_steps, last_episodes = now, steps, episodes
+
+    now = perf_counter()
+    episodes = maze.get_iteration()
+    report(steps, episodes, now - start, steps - last_steps, episodes - last_episodes, now - last_report)
+
+    if args.output is not None:
+        q_values = maze.get_agent().q_values
+        with open(args.output, "wb") as file:
+            pickle.dump(q_values, file)
+        print(f"saved Q-table with {len(q_values)} entries to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules in src import each other by bare name, as when running from inside src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
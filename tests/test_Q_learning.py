@@ -0,0 +1,174 @@
+import pytest
+
+from Action import Action
+from Q_learning import QLearningAgent
+
+
+def make_agent(**kwargs):
+    kwargs.setdefault("exploration_prob", 0)
+    return QLearningAgent(None, False, (0, 0), None, **kwargs)
+
+
+def run_chain(agent, length=10, reward=10):
+    """
+    One episode along a corridor 0 -> 1 -> ... -> length, reward only on the last step
+    """
+
+    for state in range(length):
+        agent.set_n_actions([Action.RIGHT])
+        action = agent.choose_action(state)
+        agent.update_q_value(state, action, reward if state == length - 1 else 0, state + 1)
+    agent.end_episode()
+
+
+def test_one_step_update_only_moves_last_state():
+    agent = make_agent(learning_rate=1.0)
+    run_chain(agent)
+
+    assert agent.get_q_value(9, Action.RIGHT) == 10
+    assert agent.get_q_value(8, Action.RIGHT) == 0
+
+
+def test_update_bootstraps_from_next_state_actions():
+    agent = make_agent(learning_rate=1.0, discount_factor=0.5)
+    agent.set_n_actions([Action.LEFT])
+    agent.choose_action(1)
+    agent.q_values[(1, Action.LEFT)] = 4
+
+    # n_actions now holds the moves of state 0, which must not be used to evaluate state 1
+    agent.set_n_actions([Action.RIGHT])
+    agent.choose_action(0)
+    agent.update_q_value(0, Action.RIGHT, 0, 1)
+
+    assert agent.get_q_value(0, Action.RIGHT) == 2
+
+
+def test_planning_propagates_reward_back_along_chain():
+    agent = make_agent(learning_rate=1.0, planning_steps=20)
+    run_chain(agent)
+
+    for state in range(10):
+        assert agent.get_q_value(state, Action.RIGHT) == pytest.approx(10 * 0.9 ** (9 - state))
+
+
+def test_planning_needs_fewer_real_steps():
+    # After two episodes, planning with a small step size has pushed value to the start, one-step Q has not
+    without_planning = make_agent(learning_rate=0.5)
+    with_planning = make_agent(learning_rate=0.5, planning_steps=10)
+    for _ in range(2):
+        run_chain(without_planning)
+        run_chain(with_planning)
+
+    assert without_planning.get_q_value(0, Action.RIGHT) == 0
+    assert with_planning.get_q_value(0, Action.RIGHT) > 0
+
+
+def test_queued_priority_is_residual_of_real_update():
+    agent = make_agent(learning_rate=0.5, planning_steps=1)
+    agent._plan = lambda: None  # Keep the queue as left by the real update
+    agent.set_n_actions([Action.RIGHT])
+    agent.choose_action(1)
+    agent.q_values[(1, Action.RIGHT)] = 3
+    agent.set_n_actions([Action.UP])
+    agent.choose_action(0)
+    agent.update_q_value(0, Action.UP, 1, 1)
+
+    assert agent._priorities[(0, Action.UP)] == pytest.approx(abs(agent._td_error(0, Action.UP)))
+    assert agent._td_error(0, Action.UP) == pytest.approx(0.5 * (1 + 0.9 * 3))
+
+
+def test_planning_skips_stale_queue_entries():
+    agent = make_agent(learning_rate=0.5)
+    agent._record_transition(0, Action.RIGHT, 1, 1)
+    agent._model[(0, Action.RIGHT)] = (5, 1)
+    agent._queue(0, Action.RIGHT)  # Supersedes the priority 1 entry still in the heap
+    assert len(agent._priority_queue) == 2
+
+    agent.planning_steps = 2
+    agent._plan()
+
+    assert agent.get_q_value(0, Action.RIGHT) == 2.5  # Backed up once, not twice
+    assert agent._priority_queue == []
+    assert agent._priorities == {}
+
+
+def test_planning_ignores_errors_below_threshold():
+    agent = make_agent(priority_threshold=0.5)
+    agent._record_transition(0, Action.RIGHT, 0.1, 1)
+
+    assert agent._priority_queue == []
+
+
+def test_traces_need_fewer_episodes():
+    without_traces = make_agent(learning_rate=0.5)
+    with_traces = make_agent(learning_rate=0.5, trace_decay=0.9, trace_threshold=1e-6)
+    run_chain(without_traces)
+    run_chain(with_traces)
+
+    assert without_traces.get_q_value(0, Action.RIGHT) == 0
+    assert with_traces.get_q_value(0, Action.RIGHT) == pytest.approx(0.5 * 10 * 0.81 ** 9)
+
+
+def step(agent, state, reward=0):
+    agent.set_n_actions([Action.RIGHT])
+    action = agent.choose_action(state)
+    agent.update_q_value(state, action, reward, state + 1)
+
+
+def test_traces_truncate_below_threshold():
+    agent = make_agent(trace_decay=0.5, trace_threshold=0.1)  # Traces decay by 0.45 per step
+    for state in range(3):
+        step(agent, state)
+
+    assert list(agent._traces) == [(1, Action.RIGHT), (2, Action.RIGHT)]
+    assert agent._traces[(1, Action.RIGHT)] == pytest.approx(0.45 ** 2)
+
+
+def test_traces_bounded_by_max_traces():
+    agent = make_agent(trace_decay=1.0, discount_factor=1.0, max_traces=2)
+    for state in range(5):
+        step(agent, state)
+
+    assert list(agent._traces) == [(3, Action.RIGHT), (4, Action.RIGHT)]
+
+
+def test_revisited_pair_moves_to_newest_trace():
+    agent = make_agent(trace_decay=0.9)
+    for state in (0, 1, 0):
+        step(agent, state)
+
+    assert list(agent._traces) == [(1, Action.RIGHT), (0, Action.RIGHT)]
+    assert agent._traces[(0, Action.RIGHT)] == pytest.approx(0.81)
+
+
+def test_exploratory_action_cuts_traces(monkeypatch):
+    agent = make_agent(trace_decay=0.9, exploration_prob=1.0)
+    agent.epsilon_decay = 1.0
+    monkeypatch.setattr("random.choice", lambda actions: actions[-1])
+    step(agent, 0)
+    assert agent._traces
+
+    agent.q_values[(1, Action.UP)] = 1
+    agent.set_n_actions([Action.UP, Action.DOWN])
+    assert agent.choose_action(1) == Action.DOWN
+    assert not agent._traces
+
+
+def test_random_greedy_action_keeps_traces(monkeypatch):
+    agent = make_agent(trace_decay=0.9, exploration_prob=1.0)
+    agent.epsilon_decay = 1.0
+    monkeypatch.setattr("random.choice", lambda actions: actions[0])
+    step(agent, 0)
+
+    agent.q_values[(1, Action.UP)] = 1
+    agent.set_n_actions([Action.UP, Action.DOWN])
+    assert agent.choose_action(1) == Action.UP
+    assert list(agent._traces) == [(0, Action.RIGHT)]
+
+
+def test_end_episode_clears_traces():
+    agent = make_agent(trace_decay=0.9)
+    step(agent, 0)
+    agent.end_episode()
+
+    assert not agent._traces
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from Action import Action
+from SharedData import SharedQTable, SharedMazeLayouts
+from Q_learning import QLearningAgent
+
+
+def test_q_table_round_trip():
+    q_values = {(7, Action.LEFT): 1.5, (-5, Action.UP): -2.0, (7, Action.RIGHT): 3.0}
+    with SharedQTable.publish(q_values) as published:
+        attached = SharedQTable.attach(published.name)
+        assert dict(attached) == q_values
+        assert attached.get((7, Action.DOWN), 0) == 0
+        attached.close()
+
+
+def test_q_table_evaluation_agent_never_writes():
+    with SharedQTable.publish({(1, Action.UP): 1.0, (1, Action.DOWN): 2.0}) as table:
+        agent = QLearningAgent(None, False, (0, 0), None, q_values=table, evaluate=True)
+        agent.set_n_actions([Action.UP, Action.DOWN])
+        action = agent.choose_action(1)
+        agent.update_q_value(1, action, 10, 2)
+
+        assert action == Action.DOWN
+        assert table[(1, Action.DOWN)] == 2.0
+
+
+def test_lookup_after_close_raises():
+    table = SharedQTable.publish({(1, Action.UP): 1.0})
+    table.close()
+    with pytest.raises(ValueError, match="closed"):
+        table[(1, Action.UP)]
+    table.unlink()
+
+
+def test_layouts_are_private_copies():
+    grids = [np.zeros((3, 3), dtype=np.int8), np.eye(2, dtype=np.int8)]
+    with SharedMazeLayouts.publish(grids) as layouts:
+        grid = layouts[1]
+        grid[0][0] = 5
+        assert len(layouts) == 2
+        assert layouts[1].tolist() == [[1, 0], [0, 1]]
+
+    assert grid.sum() == 6  # Still valid after the segment is gone